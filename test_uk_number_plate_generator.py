@@ -2,6 +2,10 @@ import pytest
 from unittest import mock
 from unittest.mock import patch
 from datetime import datetime
+import mmap
+import os
+import subprocess
+import sys
 
 from uk_number_plate_generator import UKNumberPlateGenerator
 
@@ -15,19 +19,34 @@ def test_generate_age_identifier(datetime, expected_year_code):
     assert UKNumberPlateGenerator('plates.csv').generate_age_identifier(datetime) == expected_year_code
    
    
-@pytest.mark.parametrize("number_plate_prefix, start_index, existing_plates, return_string", [
-    ("YA07", 0, set(), "AAA"),
-    ("YA07", 0, {"YA07 AAA", "YA07 AAB"}, "AAC"),
-    ("AB57", 12166, set(), "YYY"),
-    ("AB57", 0, {"AB57 YYY"}, "AAA")
+@pytest.mark.parametrize("number_plate_prefix, random_indexes, existing_plates, return_string", [
+    ("YA07", [0], set(), "AAA"),
+    ("YA07", [0, 1, 2], {"YA07 AAA", "YA07 AAB"}, "AAC"),
+    ("AB57", [12166], set(), "YYY"),
+    ("AB57", [12166, 0], {"AB57 YYY"}, "AAA"),
+    ("AB57", [12167, 16383, 5], set(), "AAF")
 ])
-def test_generate_available_random_string(number_plate_prefix, start_index, existing_plates, return_string):
-    with patch('random.randint', return_value=start_index):
+def test_generate_available_random_string(number_plate_prefix, random_indexes, existing_plates, return_string):
+    with patch('random.getrandbits', side_effect=random_indexes):
         generator = UKNumberPlateGenerator('test.csv')
         generator.existing_generated_plates = existing_plates
         assert generator.generate_available_random_string(number_plate_prefix) == return_string
         
         
+def test_generate_available_random_string_dense_prefix():
+    generator = UKNumberPlateGenerator('test.csv')
+    generator.existing_generated_plates = set(["DH14 "+combo for combo in UKNumberPlateGenerator.all_possible_random_strings if combo != "KLM"])
+    assert generator.generate_available_random_string("DH14") == "KLM"
+    
+    
+@pytest.mark.parametrize("start_index, return_string", [(0, "AAB"), (2, "YYX"), (12166, "AAB")])
+def test_generate_available_random_string_dense_prefix_wraps_around(start_index, return_string):
+    with patch('random.randrange', return_value=start_index):
+        generator = UKNumberPlateGenerator('test.csv')
+        generator.existing_generated_plates = set(["DH14 "+combo for combo in UKNumberPlateGenerator.all_possible_random_strings if combo not in ("AAB", "YYX")])
+        assert generator.generate_available_random_string("DH14") == return_string
+        
+        
 def test_generate_available_random_string_raises_error():
     with pytest.raises(ValueError) as err_info:
         generator = UKNumberPlateGenerator('test.csv')
@@ -37,27 +56,76 @@ def test_generate_available_random_string_raises_error():
     assert str(err_info.value) == 'No more unique strings available'
     
 
-@pytest.mark.parametrize("dvla_memory_tag, date_created_str, random_start_index, existing_plates, expected_generated_plate, expected_end_plate_set", [
-    ("YR", "03/11/2017", 5, set(), "YR67 AAF", {"YR67 AAF"}),
-    ("ER", "08/01/2009", 0, {"ER58 AAA", "ER58 AAB"}, "ER58 AAC", {"ER58 AAA", "ER58 AAB", "ER58 AAC"}),
-    ("GH", "06/07/2021", 645, set(), "GH21 BFB", {"GH21 BFB"}),
+@pytest.mark.parametrize("dvla_memory_tag, date_created_str, random_indexes, existing_plates, expected_generated_plate, expected_end_plate_set", [
+    ("YR", "03/11/2017", [5], set(), "YR67 AAF", {"YR67 AAF"}),
+    ("ER", "08/01/2009", [0, 1, 2], {"ER58 AAA", "ER58 AAB"}, "ER58 AAC", {"ER58 AAA", "ER58 AAB", "ER58 AAC"}),
+    ("GH", "06/07/2021", [645], set(), "GH21 BFB", {"GH21 BFB"}),
 ])    
-def test_generate_numberplate(dvla_memory_tag, date_created_str, random_start_index, existing_plates, expected_generated_plate, expected_end_plate_set):
-    with patch('random.randint', return_value=random_start_index):
+def test_generate_numberplate(dvla_memory_tag, date_created_str, random_indexes, existing_plates, expected_generated_plate, expected_end_plate_set):
+    with patch('random.getrandbits', side_effect=random_indexes):
         generator = UKNumberPlateGenerator('test.csv')
         generator.existing_generated_plates = existing_plates.copy()
         assert generator.generate_numberplate(dvla_memory_tag, date_created_str) == expected_generated_plate
         assert generator.existing_generated_plates == expected_end_plate_set
         
         
+def test_generate_numberplates():
+    generator = UKNumberPlateGenerator('test.csv')
+    generator.existing_generated_plates = {"YR67 AAA"}
+    plates = generator.generate_numberplates("yr", "03/11/2017", 100)
+    
+    assert len(set(plates)) == 100
+    assert all(plate.startswith("YR67 ") for plate in plates)
+    assert "YR67 AAA" not in plates
+    assert generator.existing_generated_plates == {"YR67 AAA", *plates}
+    
+    # the batch is tracked the same way single plates are
+    plate = generator.generate_numberplate("YR", "03/11/2017")
+    assert plate not in plates and plate != "YR67 AAA"
+    
+    
+def test_generate_numberplates_is_reproducible_with_a_seed():
+    # the picks must not depend on string hashing, which changes between runs
+    script = (
+        "import random; from uk_number_plate_generator import UKNumberPlateGenerator; "
+        "generator = UKNumberPlateGenerator('test.csv'); generator.existing_generated_plates = {'YR67 AAA', 'YR67 KLM'}; "
+        "random.seed(1); print(generator.generate_numberplates('YR', '03/11/2017', 5))"
+    )
+    outputs = {
+        subprocess.run(
+            [sys.executable, '-c', script], env={**os.environ, 'PYTHONHASHSEED': hash_seed},
+            cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, check=True
+        ).stdout for hash_seed in ('0', '1', '2')
+    }
+    assert len(outputs) == 1
+    
+    
+def test_generate_numberplates_raises_error():
+    generator = UKNumberPlateGenerator('test.csv')
+    generator.existing_generated_plates = set(["DH14 "+combo for combo in UKNumberPlateGenerator.all_possible_random_strings[1:]])
+    with pytest.raises(ValueError) as err_info:
+        generator.generate_numberplates("DH", "01/04/2014", 2)
+        
+    assert str(err_info.value) == 'No more unique strings available'
+    assert generator.generate_numberplates("DH", "01/04/2014", 1) == ["DH14 AAA"]
+    
+    
 @pytest.mark.parametrize("dvla_memory_tag, date_created_str, expected_error_message", [
     ("YQ", "03/11/2017", 'I, Q, Z not allowed in UK number plates'),
     ("IK", "03/11/2017", 'I, Q, Z not allowed in UK number plates'),
     ("ZT", "03/11/2017", 'I, Q, Z not allowed in UK number plates'),
     ("A", "03/11/2017", 'DVLA memory tag must be 2 characters in length'),
     ("ABC", "03/11/2017", 'DVLA memory tag must be 2 characters in length'),
+    ("aß", "03/11/2017", 'DVLA memory tag must be 2 characters in length'),
+    ("A-", "03/11/2017", 'DVLA memory tag must only contain letters'),
+    ("A ", "03/11/2017", 'DVLA memory tag must only contain letters'),
+    ("A1", "03/11/2017", 'DVLA memory tag must only contain letters'),
+    ("Aé", "03/11/2017", 'DVLA memory tag must only contain letters'),
     ("AB", "00/11/2017", "time data '00/11/2017' does not match format '%d/%m/%Y'"),
     ("AB", "03-11-2017", "time data '03-11-2017' does not match format '%d/%m/%Y'"),
+    ("AB", "03/11/20170", "unconverted data remains: 0"),
+    ("AB", "31/02/2010", "day is out of range for month"),
+    ("AB", "03/11/017", "time data '03/11/017' does not match format '%d/%m/%Y'"),
 ])    
 def test_generate_numberplate_raises_error(dvla_memory_tag, date_created_str, expected_error_message):
     with pytest.raises(ValueError) as err_info:
@@ -67,41 +135,241 @@ def test_generate_numberplate_raises_error(dvla_memory_tag, date_created_str, ex
     assert str(err_info.value) == expected_error_message
 
 
+@pytest.mark.parametrize("date_created_str", ["03/11/2017", "3/4/2010", " 3/11/2017", "29/02/2012", "31/12/0001"])
+def test_parse_date_matches_strptime(date_created_str):
+    assert UKNumberPlateGenerator._parse_date(date_created_str) == datetime.strptime(date_created_str, "%d/%m/%Y")
+
+
 def test_load_from_csv():
-    mock_data = '\n'.join(["YP10 UNK", "YP10 SHU", "YP10 EHW"])
+    mock_data = b'\n'.join([b"YP10 UNK", b"YP10 SHU", b"YP10 EHW"])
     m = mock.mock_open(read_data=mock_data)
-    with mock.patch('builtins.open', m):
+    with mock.patch('builtins.open', m), mock.patch('os.fstat', return_value=mock.Mock(st_size=len(mock_data))):
         generator = UKNumberPlateGenerator('test.csv')
         data = generator.load_from_csv()
         assert len(data) == 3
         assert data == {"YP10 UNK", "YP10 SHU", "YP10 EHW"}
         
         
+def test_load_from_csv_memory_mapped(tmp_path):
+    save_file_path = tmp_path / 'test.csv'
+    save_file_path.write_bytes(b"YP10 UNK\r\nYP10 SHU\r\n\r\nYP10 EHW\nYP10 UNK")
+    with patch.object(UKNumberPlateGenerator, '_MMAP_LOAD_THRESHOLD', 0), patch('mmap.mmap', wraps=mmap.mmap) as mock_mmap:
+        generator = UKNumberPlateGenerator(str(save_file_path))
+        
+    mock_mmap.assert_called_once()
+    assert generator.existing_generated_plates == {"YP10 UNK", "YP10 SHU", "YP10 EHW"}
+        
+        
+@pytest.mark.parametrize("mmap_load_threshold", [100 * 1024 * 1024, 0])
+def test_load_from_csv_bom_and_non_ascii(tmp_path, capsys, mmap_load_threshold):
+    save_file_path = tmp_path / 'test.csv'
+    save_file_path.write_bytes(b"\xef\xbb\xbfYP10 UNK\r\nYP10 \xc3\x9cNK\r\nYP10 SHU\r\n")
+    with patch.object(UKNumberPlateGenerator, '_MMAP_LOAD_THRESHOLD', mmap_load_threshold):
+        generator = UKNumberPlateGenerator(str(save_file_path))
+        
+    # the BOM is dropped and the non ascii row is skipped like any other invalid row
+    assert generator.existing_generated_plates == {"YP10 UNK", "YP10 SHU"}
+    assert "skipped 1 rows that are not valid number plates" in capsys.readouterr().out
+    
+    generator.save_to_csv()
+    assert set(save_file_path.read_bytes().split(b'\r\n')) == {b"YP10 UNK", b"YP10 \xc3\x9cNK", b"YP10 SHU", b""}
+    
+    
+@pytest.mark.parametrize("mmap_load_threshold", [100 * 1024 * 1024, 0])
+def test_load_from_csv_not_utf8(tmp_path, mmap_load_threshold):
+    save_file_path = tmp_path / 'test.csv'
+    save_file_path.write_bytes(b"YP10 UNK\r\nYP10 \xff\xfeK\r\n")
+    with patch.object(UKNumberPlateGenerator, '_MMAP_LOAD_THRESHOLD', mmap_load_threshold):
+        with pytest.raises(ValueError) as err_info:
+            UKNumberPlateGenerator(str(save_file_path))
+            
+    assert str(err_info.value).startswith(f"Failed to load '{save_file_path}', it is not a utf-8 text file: ")
+        
+        
+@pytest.mark.parametrize("mmap_load_threshold, mmap_load_chunk_size", [(100 * 1024 * 1024, 16 * 1024 * 1024), (0, 16 * 1024 * 1024), (0, 1), (0, 3), (0, 10)])
+def test_load_from_csv_splits_rows_the_same_in_both_paths(tmp_path, mmap_load_threshold, mmap_load_chunk_size):
+    save_file_path = tmp_path / 'test.csv'
+    save_file_path.write_bytes(b"\xef\xbb\xbfYP10 UNK\r\nYP10 \xc3\x9cNK\nYP10 SHU\rX\r\n\x0cYP10 EHW\r\r\nYP10 MNS")
+    with patch.object(UKNumberPlateGenerator, '_MMAP_LOAD_THRESHOLD', mmap_load_threshold), patch.object(UKNumberPlateGenerator, '_MMAP_LOAD_CHUNK_SIZE', mmap_load_chunk_size):
+        generator = UKNumberPlateGenerator(str(save_file_path))
+        
+        # rows end only at \n, a lone \r or other line break chars are part of the row
+        assert generator.load_from_csv() == {"YP10 UNK", "YP10 ÜNK", "YP10 SHU\rX", "\x0cYP10 EHW\r", "YP10 MNS"}
+        
+        
 def test_save_to_csv():
+    with mock.patch('builtins.open', side_effect=FileNotFoundError):
+        generator = UKNumberPlateGenerator('test.csv')
+        
     mock_file = mock.mock_open(read_data=None)
     with mock.patch('builtins.open', mock_file):
-        generator = UKNumberPlateGenerator('test.csv')
         generator.existing_generated_plates = {"YP10 UNK", "YP10 SHU", "YP10 EHW"}
         generator.save_to_csv()
-        mock_file.assert_called_once_with('test.csv', mode='w', newline='', encoding='utf-8')
+        mock_file.assert_called_once_with('test.csv', mode='wb')
         
         handle = mock_file()
-        handle.write.assert_any_call('YP10 UNK\r\n')
-        handle.write.assert_any_call('YP10 SHU\r\n')
-        handle.write.assert_any_call('YP10 EHW\r\n')
+        written = b''.join(call.args[0] for call in handle.write.call_args_list)
+        assert written.endswith(b'\r\n')
+        assert set(written.split(b'\r\n')[:-1]) == {b"YP10 UNK", b"YP10 SHU", b"YP10 EHW"}
+        
+@pytest.mark.parametrize("plate", ["YP10 ÜNK", "yp10 unk", "YP10-UNK", "PLATE", "   ", "YP10 AAAYP10 MNS", " AAA"])
+def test_existing_generated_plates_rejects_invalid_chars(plate):
+    generator = UKNumberPlateGenerator('test.csv')
+    with pytest.raises(ValueError) as err_info:
+        generator.existing_generated_plates = {plate}
+        
+    assert str(err_info.value) == f"'{plate}' is not a valid number plate"
+    
+    
+def test_init_skips_invalid_rows(tmp_path, capsys):
+    save_file_path = tmp_path / 'test.csv'
+    save_file_path.write_bytes(b"PLATE\r\nYP10 UNK\r\n   \r\nYP10 AAAYP10 MNS\r\nYP10 SHU\r\n")
+    generator = UKNumberPlateGenerator(str(save_file_path))
+    
+    assert "skipped 3 rows that are not valid number plates" in capsys.readouterr().out
+    assert generator.existing_generated_plates == {"YP10 UNK", "YP10 SHU"}
+    
+    # loaded random strings are the shared instances, not a new string per plate
+    suffix = next(iter(generator.used_suffixes["YP10"]))
+    assert any(suffix is random_string for random_string in UKNumberPlateGenerator.all_possible_random_strings)
+    
+    # a full save keeps the skipped rows rather than dropping them
+    generator.save_to_csv()
+    assert set(save_file_path.read_bytes().split(b'\r\n')) == {b"PLATE", b"YP10 UNK", b"   ", b"YP10 AAAYP10 MNS", b"YP10 SHU", b""}
+    
+    
+def test_existing_generated_plates_is_mutable():
+    generator = UKNumberPlateGenerator('test.csv')
+    generator.existing_generated_plates = set(["DH14 "+combo for combo in UKNumberPlateGenerator.all_possible_random_strings[2:]])
+    generator.existing_generated_plates.add("DH14 AAA")
+    
+    assert "DH14 AAA" in generator.existing_generated_plates
+    assert generator.generate_available_random_string("DH14") == "AAB"
+    
+    generator.existing_generated_plates.discard("DH14 YYY")
+    generator.existing_generated_plates -= {"DH14 YYX", "AB10 AAA"}
+    assert generator.used_suffixes["DH14"].isdisjoint({"AAB", "YYY", "YYX"})
+    assert len(generator.existing_generated_plates) == len(UKNumberPlateGenerator.all_possible_random_strings) - 3
+    
+    with pytest.raises(ValueError):
+        generator.existing_generated_plates.add("PLATE")
+        
+        
+def test_existing_generated_plates_set_operations():
+    generator = UKNumberPlateGenerator('test.csv')
+    generator.existing_generated_plates = {"YP10 UNK", "YP10 SHU"}
+    plates = generator.existing_generated_plates
+    other = {"YP10 SHU", "AB57 YYY"}
+    
+    # operators and methods returning a new set give a plain set
+    for result, expected in [
+        (plates - other, {"YP10 UNK"}),
+        (other - plates, {"AB57 YYY"}),
+        (plates | other, {"YP10 UNK", "YP10 SHU", "AB57 YYY"}),
+        (other | plates, {"YP10 UNK", "YP10 SHU", "AB57 YYY"}),
+        (plates & other, {"YP10 SHU"}),
+        (plates ^ other, {"YP10 UNK", "AB57 YYY"}),
+        (plates.copy(), {"YP10 UNK", "YP10 SHU"}),
+        (plates.union(other, ["GH21 BFB"]), {"YP10 UNK", "YP10 SHU", "AB57 YYY", "GH21 BFB"}),
+        (plates.intersection(other), {"YP10 SHU"}),
+        (plates.difference(other), {"YP10 UNK"}),
+        (plates.symmetric_difference(other), {"YP10 UNK", "AB57 YYY"}),
+    ]:
+        assert type(result) is set
+        assert result == expected
+    assert plates == {"YP10 UNK", "YP10 SHU"}
+    assert plates.issubset(["YP10 UNK", "YP10 SHU", "AB57 YYY"]) and not plates.issubset(other)
+    assert plates.issuperset(["YP10 UNK"]) and not plates.issuperset(other)
+    
+    # in place methods update the generator
+    plates.update(other, ["GH21 BFB"])
+    assert generator.used_suffixes["AB57"] == {"YYY"} and generator.used_suffixes["GH21"] == {"BFB"}
+    plates.difference_update(["GH21 BFB"], ["AB57 YYY"])
+    assert plates == {"YP10 UNK", "YP10 SHU"}
+    plates.intersection_update(other)
+    assert plates == {"YP10 SHU"}
+    plates.symmetric_difference_update(other)
+    assert plates == {"AB57 YYY"}
+    plates.difference_update(plates)
+    assert len(plates) == 0
+    
+    
+def test_save_new_to_csv(tmp_path):
+    save_file_path = str(tmp_path / 'test.csv')
+    with patch('random.getrandbits', side_effect=[0, 1]):
+        generator = UKNumberPlateGenerator(save_file_path)
+        generator.generate_numberplate("YP", "03/04/2010")
+        generator.save_new_to_csv()
+        generator.generate_numberplate("YP", "03/04/2010")
+        generator.save_new_to_csv()
+        generator.save_new_to_csv()
+        
+    with open(save_file_path, 'rb') as file:
+        assert file.read() == b"YP10 AAA\r\nYP10 AAB\r\n"
+    assert UKNumberPlateGenerator(save_file_path).existing_generated_plates == {"YP10 AAA", "YP10 AAB"}
+    
+    
+@pytest.mark.parametrize("existing_data", [b"YP10 AAA", b"YP10 AAA\r\n", b"YP10 AAA\n"])
+def test_save_new_to_csv_starts_a_new_row(tmp_path, existing_data):
+    save_file_path = tmp_path / 'test.csv'
+    save_file_path.write_bytes(existing_data)
+    generator = UKNumberPlateGenerator(str(save_file_path))
+    generator.existing_generated_plates.add("YP10 MNS")
+    generator.save_new_to_csv()
+    
+    assert save_file_path.read_bytes().splitlines() == [b"YP10 AAA", b"YP10 MNS"]
+    assert UKNumberPlateGenerator(str(save_file_path)).existing_generated_plates == {"YP10 AAA", "YP10 MNS"}
+    
+    
+def test_save_new_to_csv_rewrites_after_replace_or_remove(tmp_path):
+    save_file_path = tmp_path / 'test.csv'
+    save_file_path.write_bytes(b"YP10 AAA\r\nYP10 AAB\r\n")
+    generator = UKNumberPlateGenerator(str(save_file_path))
+    
+    # added then removed before saving, so it was never in the file and appending still works
+    generator.existing_generated_plates.add("YP10 AAC")
+    generator.existing_generated_plates.discard("YP10 AAC")
+    generator.existing_generated_plates.add("YP10 AAD")
+    generator.save_new_to_csv()
+    assert save_file_path.read_bytes() == b"YP10 AAA\r\nYP10 AAB\r\nYP10 AAD\r\n"
+    
+    # removing a saved plate can only be saved by rewriting the file
+    generator.existing_generated_plates.discard("YP10 AAA")
+    generator.save_new_to_csv()
+    assert set(save_file_path.read_bytes().splitlines()) == {b"YP10 AAB", b"YP10 AAD"}
+    
+    # assigning replaces every plate, the unsaved ones included
+    generator.existing_generated_plates.add("YP10 AAE")
+    generator.existing_generated_plates = {"AB57 YYY"}
+    assert generator._unsaved == set()
+    generator.save_new_to_csv()
+    assert save_file_path.read_bytes() == b"AB57 YYY\r\n"
+    
+    generator.existing_generated_plates.clear()
+    generator.save_new_to_csv()
+    assert save_file_path.read_bytes() == b""
         
 
 def test_init():
-    mock_data = '\n'.join(["YP10 UNK", "YP10 SHU", "YP10 EHW"])
-    m = mock.mock_open(read_data=mock_data)
-    with mock.patch('builtins.open', m):
+    with mock.patch('builtins.open', side_effect=FileNotFoundError):
         generator = UKNumberPlateGenerator('test.csv')
         assert generator.existing_generated_plates == set()
         
-        with mock.patch('os.path.isfile', return_value=True):
-            generator = UKNumberPlateGenerator('test.csv')
-            assert generator.existing_generated_plates == {"YP10 UNK", "YP10 SHU", "YP10 EHW"}
+    mock_data = b'\n'.join([b"YP10 UNK", b"YP10 SHU", b"YP10 EHW"])
+    m = mock.mock_open(read_data=mock_data)
+    with mock.patch('builtins.open', m), mock.patch('os.fstat', return_value=mock.Mock(st_size=len(mock_data))):
+        generator = UKNumberPlateGenerator('test.csv')
+        assert generator.existing_generated_plates == {"YP10 UNK", "YP10 SHU", "YP10 EHW"}
             
     with pytest.raises(ValueError) as err_info:
         generator = UKNumberPlateGenerator('testcsv')
-        assert str(err_info.value) == "File must be a .csv file"
\ No newline at end of file
+        assert str(err_info.value) == "File must be a .csv file"
+        
+        
+def test_init_load_failure():
+    # starting empty instead would overwrite the unreadable file on the next save
+    with mock.patch('builtins.open', side_effect=PermissionError("denied")):
+        with pytest.raises(PermissionError) as err_info:
+            UKNumberPlateGenerator('test.csv')
+            
+    assert str(err_info.value) == "denied"
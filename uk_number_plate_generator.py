@@ -1,11 +1,122 @@
+from collections import defaultdict
 from datetime import datetime
-from itertools import product
-from typing import Set
+from functools import lru_cache
+from itertools import chain, filterfalse, islice, product
+from typing import Any, Callable, Dict, Generic, Iterable, Iterator, List, MutableSet, Set, Tuple, TypeVar
 import string
 import random
-import csv
+import codecs
+import mmap
 import os
 
+T = TypeVar('T')
+
+
+class _lazy_class_attribute(Generic[T]):
+    """A class attribute computed on first access and then stored on the class in place of the descriptor"""
+    
+    def __init__(self, compute: Callable[[Any], T]) -> None:
+        self.compute = compute
+        self.name = compute.__name__
+    
+    def __get__(self, instance: object, owner: type) -> T:
+        value = self.compute(owner)
+        setattr(owner, self.name, value)
+        return value
+
+
+class _ExistingPlates(MutableSet[str]):
+    """A live, mutable set of a generator's plates, backed by its prefix -> used suffixes index
+    
+    supports the set operators and the methods of the built in set, operators and methods that return a new set return a plain set
+    """
+    
+    def __init__(self, generator: 'UKNumberPlateGenerator') -> None:
+        self._generator = generator
+    
+    @classmethod
+    def _from_iterable(cls, it: Iterable[str]) -> Set[str]:
+        return set(it)
+    
+    def __contains__(self, plate: object) -> bool:
+        if not isinstance(plate, str):
+            return False
+        prefix, _, suffix = plate.partition(' ')
+        return suffix in self._generator.used_suffixes.get(prefix, ())
+    
+    def __iter__(self) -> Iterator[str]:
+        for prefix, suffixes in self._generator.used_suffixes.items():
+            qualified_prefix = prefix + ' '
+            for suffix in suffixes:
+                yield qualified_prefix + suffix
+    
+    def __len__(self) -> int:
+        return sum(map(len, self._generator.used_suffixes.values()))
+    
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({set(self)!r})"
+    
+    def add(self, plate: str) -> None:
+        prefix, suffix = self._generator._split_plate(plate)
+        used_suffixes = self._generator.used_suffixes[prefix]
+        if suffix not in used_suffixes:
+            used_suffixes.add(suffix)
+            self._generator._unsaved.add(plate)
+    
+    def discard(self, plate: str) -> None:
+        prefix, _, suffix = plate.partition(' ')
+        used_suffixes = self._generator.used_suffixes.get(prefix, set())
+        if suffix in used_suffixes:
+            used_suffixes.discard(suffix)
+            if plate in self._generator._unsaved:
+                self._generator._unsaved.discard(plate)
+            else:
+                # the plate may already be in the file, appending cannot remove it
+                self._generator._rewrite_needed = True
+    
+    def clear(self) -> None:
+        self._generator.used_suffixes.clear()
+        self._generator._unsaved.clear()
+        self._generator._rewrite_needed = True
+    
+    def copy(self) -> Set[str]:
+        return set(self)
+    
+    def union(self, *others: Iterable[str]) -> Set[str]:
+        return set(self).union(*others)
+    
+    def intersection(self, *others: Iterable[str]) -> Set[str]:
+        return set(self).intersection(*others)
+    
+    def difference(self, *others: Iterable[str]) -> Set[str]:
+        return set(self).difference(*others)
+    
+    def symmetric_difference(self, other: Iterable[str]) -> Set[str]:
+        return set(self).symmetric_difference(other)
+    
+    def issubset(self, other: Iterable[str]) -> bool:
+        return set(self).issubset(other)
+    
+    def issuperset(self, other: Iterable[str]) -> bool:
+        return all(plate in self for plate in other)
+    
+    def update(self, *others: Iterable[str]) -> None:
+        for other in others:
+            for plate in other:
+                self.add(plate)
+    
+    def difference_update(self, *others: Iterable[str]) -> None:
+        # copy first, an other may be this view
+        for plate in set(chain.from_iterable(others)):
+            self.discard(plate)
+    
+    def intersection_update(self, *others: Iterable[str]) -> None:
+        self.difference_update(set(self).difference(set(self).intersection(*others)))
+    
+    def symmetric_difference_update(self, other: Iterable[str]) -> None:
+        self ^= set(other)
+
+
 class UKNumberPlateGenerator:
     """A UK number plate generator
     
@@ -13,59 +124,232 @@ class UKNumberPlateGenerator:
     """
     
     # define the suitable chars to use, I, Q, Z not allowed
+    _INVALID_CHARS = frozenset('IQZ')
     allowed_plate_chars = [char for char in string.ascii_uppercase if char not in 'IQZ']
-    all_possible_random_strings = [''.join(combo) for combo in product(allowed_plate_chars, repeat = 3)]
+    
+    # below this many used suffixes a prefix is sparse enough to find a free suffix by random guessing
+    _SPARSE_SUFFIX_LIMIT = len(allowed_plate_chars) ** 3 // 2
+    _MAX_SAMPLE_ATTEMPTS = 16
+    _RANDOM_INDEX_BITS = (len(allowed_plate_chars) ** 3 - 1).bit_length()
+    
+    # save files bigger than this are memory mapped when loaded, and decoded this many bytes at a time
+    _MMAP_LOAD_THRESHOLD = 100 * 1024 * 1024
+    _MMAP_LOAD_CHUNK_SIZE = 16 * 1024 * 1024
+    
+    @_lazy_class_attribute
+    def all_possible_random_strings(cls) -> Tuple[str, ...]:
+        """every 3 char random string, only built the first time it is needed"""
+        return tuple(map(''.join, product(cls.allowed_plate_chars, repeat = 3)))
+    
+    
+    @_lazy_class_attribute
+    def _canonical_suffixes(cls) -> Dict[str, str]:
+        """maps each random string to the shared instance in all_possible_random_strings, so stored suffixes cost no extra memory"""
+        return {random_string: random_string for random_string in cls.all_possible_random_strings}
+    
     
     def __init__(self, save_file_path: str):
         """Inits UKNumberPlateGenerator and loads any existing data from the save_file_path
 
+        rows of an existing file that are not valid number plates (e.g. a header) are skipped, and written back as they are on save
+
         Args:
             save_file_path (str): the location to load (if exists) and save the results to, must be a .csv file
 
         Raises:
             ValueError: if the file path is not .csv
+            ValueError: if the existing file is not utf-8 text
+            IOError: if the existing file cannot be read, rather than starting empty and overwriting it on the next save
         """
         self.save_file_path = save_file_path
+        self._unsaved: Set[str] = set() # added since the last save
+        self._rewrite_needed = False # plates replaced or removed since the last save, so the file must be rewritten
+        self._skipped_rows: List[str] = [] # loaded rows that are not plates, kept so a full save does not lose them
         
-        if(save_file_path[-4:] != ".csv"):
+        if(not save_file_path.endswith(".csv")):
             raise ValueError("File must be a .csv file")
         
         try:
-            # check file exists, or else create it
-            if(os.path.isfile(self.save_file_path)):
-                self.existing_generated_plates = self.load_from_csv()
-            else:
-                self.existing_generated_plates = set()
-        except IOError as err:
-            print("Failed to load existing generated plates due to {err}")
+            # just try to load, a missing file means there are no plates yet and it is created on save
+            self._skipped_rows = self._replace_plates(self.load_from_csv(), skip_invalid=True)
+            if self._skipped_rows:
+                print(f"skipped {len(self._skipped_rows)} rows that are not valid number plates, they are kept in the file when saving")
+        except FileNotFoundError:
+            self._replace_plates(set(), skip_invalid=False)
+    
+    
+    @property
+    def existing_generated_plates(self) -> MutableSet[str]:
+        """the generated and loaded plates
+
+        a live set backed by used_suffixes, so adding or discarding plates on it updates the generator
+
+        Returns:
+            MutableSet[str]: the existing generated plates
+        """
+        return _ExistingPlates(self)
+    
+    
+    @existing_generated_plates.setter
+    def existing_generated_plates(self, plates: Iterable[str]) -> None:
+        """replace the existing generated plates and rebuild the prefix -> used suffixes index
+
+        Args:
+            plates (Iterable[str]): the existing generated plates
+
+        Raises:
+            ValueError: if a plate is not a valid number plate
+        """
+        self._replace_plates(plates, skip_invalid=False)
+        
+        # the file no longer matches the stored plates plus the unsaved ones
+        self._unsaved.clear()
+        self._rewrite_needed = True
+    
+    
+    def _replace_plates(self, plates: Iterable[str], skip_invalid: bool) -> List[str]:
+        """replace the stored plates and rebuild the prefix -> used suffixes index
+
+        Args:
+            plates (Iterable[str]): the plates to store
+            skip_invalid (bool): leave out plates that are not valid number plates instead of raising
+
+        Raises:
+            ValueError: if a plate is not a valid number plate and skip_invalid is False
+
+        Returns:
+            List[str]: the non empty rows that were left out
+        """
+        # build the new index before replacing the old one, plates may be a view of the current plates
+        used_suffixes: Dict[str, Set[str]] = defaultdict(set)
+        canonical_suffixes = self._canonical_suffixes
+        skipped_rows: List[str] = []
+        for plate in plates:
+            # same checks as _split_plate, inlined as this runs for every loaded plate
+            prefix, _, suffix = plate.partition(' ')
+            canonical_suffix = canonical_suffixes.get(suffix)
+            suffixes = used_suffixes.get(prefix)
+            if suffixes is None or canonical_suffix is None:
+                # a prefix only needs checking the first time it is seen
+                if canonical_suffix is None or not (prefix.isascii() and prefix.isalnum()):
+                    if not skip_invalid:
+                        self._split_plate(plate) # raises the invalid plate error
+                    if plate:
+                        skipped_rows.append(plate)
+                    continue
+                suffixes = used_suffixes[prefix] = set()
+            suffixes.add(canonical_suffix)
+        self.used_suffixes = used_suffixes
+        return skipped_rows
+    
+    
+    @classmethod
+    def _split_plate(cls, plate: str) -> Tuple[str, str]:
+        """split a plate into its prefix and its random string, the shared instance from all_possible_random_strings
+
+        Args:
+            plate (str): the number plate
+
+        Raises:
+            ValueError: if the plate is not an alphanumeric prefix, a space and a valid random string
+
+        Returns:
+            Tuple[str, str]: the prefix and random string
+        """
+        prefix, _, suffix = plate.partition(' ')
+        canonical_suffix = cls._canonical_suffixes.get(suffix)
+        if canonical_suffix is None or not (prefix.isascii() and prefix.isalnum()):
+            raise ValueError(f"'{plate}' is not a valid number plate")
+        return prefix, canonical_suffix
     
     
     def load_from_csv(self) -> Set[str]:
         """load the existing generated plates from a csv file
 
+        Raises:
+            ValueError: if the file is not utf-8 text
+
         Returns:
             Set[str]: the existing generated plates
         """
-        csv_rows = []
-        with open(self.save_file_path, mode='r', newline='', encoding='utf-8') as file:
-            reader = csv.reader(file)
-            for row in reader:
-                if row:  # ensure the row is not empty
-                    csv_rows.append(row[0])
-        print(f"successfully loaded {len(csv_rows)} rows from '{self.save_file_path}'")
-        return set(csv_rows) # make sure there are no duplicates
+        # one plate per line and never quoted, so read raw bytes and decode once,
+        # utf-8-sig drops a leading BOM and is as fast as ascii for the plates themselves
+        with open(self.save_file_path, mode='rb') as file:
+            try:
+                if os.fstat(file.fileno()).st_size > self._MMAP_LOAD_THRESHOLD:
+                    # very large files are decoded a chunk at a time from the page cache, never holding a copy of the whole file
+                    plates = set()
+                    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+                    partial_row = ''
+                    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+                        for start in range(0, len(mapped_file), self._MMAP_LOAD_CHUNK_SIZE):
+                            rows = self._split_rows(partial_row + decoder.decode(mapped_file[start:start + self._MMAP_LOAD_CHUNK_SIZE]))
+                            # the last row may carry on into the next chunk
+                            partial_row = rows.pop()
+                            plates.update(rows)
+                    plates.add(partial_row + decoder.decode(b'', final=True))
+                else:
+                    plates = set(self._split_rows(file.read().decode('utf-8-sig'))) # make sure there are no duplicates
+            except UnicodeDecodeError as err:
+                raise ValueError(f"Failed to load '{self.save_file_path}', it is not a utf-8 text file: {err}") from None
+        plates.discard('') # ignore empty rows
+        print(f"successfully loaded {len(plates)} rows from '{self.save_file_path}'")
+        return plates
+    
+    
+    @staticmethod
+    def _split_rows(text: str) -> List[str]:
+        """split text into rows on \n, dropping the \r of a \r\n line ending
+
+        Args:
+            text (str): the text to split
+
+        Returns:
+            List[str]: the rows, the last one being whatever follows the final \n
+        """
+        return text.replace('\r\n', '\n').split('\n')
 
     
     def save_to_csv(self) -> None:
         """save the generated and loaded results to the csv file 
         """
-        with open(self.save_file_path, mode='w', newline='', encoding='utf-8') as file:
-            writer = csv.writer(file)
-            for string in self.existing_generated_plates:
-                writer.writerow([string])
+        # plates never need quoting, so write them in one go with the same \r\n line endings csv.writer used
+        # plates are ascii, rows kept from loading may not be so they go back out as the utf-8 they were read as
+        payload = ''.join(chain(
+            (row + '\r\n' for row in self._skipped_rows),
+            (f"{prefix} {suffix}\r\n" for prefix, suffixes in self.used_suffixes.items() for suffix in suffixes)
+        )).encode('utf-8')
+        with open(self.save_file_path, mode='wb') as file:
+            file.write(payload)
+        self._unsaved.clear()
+        self._rewrite_needed = False
         print(f"Successfully saved {len(self.existing_generated_plates)} existing generated plates to '{self.save_file_path}'")
         
     
+    def save_new_to_csv(self) -> None:
+        """append only the plates added since the last save to the csv file, rather than rewriting it
+
+        if plates were assigned to existing_generated_plates or removed from it since the last save,
+        appending cannot bring the file up to date so the whole file is rewritten with save_to_csv instead
+        """
+        if self._rewrite_needed:
+            self.save_to_csv()
+            return
+        
+        payload = ''.join(plate + '\r\n' for plate in self._unsaved).encode('ascii', errors='strict')
+        if payload:
+            with open(self.save_file_path, mode='a+b') as file:
+                # start a new row if the file does not end with one, or the first new plate joins the last row
+                end = file.seek(0, os.SEEK_END)
+                if end:
+                    file.seek(end - 1)
+                    if file.read(1) not in b'\r\n':
+                        payload = b'\r\n' + payload
+                file.write(payload)
+        print(f"Successfully saved {len(self._unsaved)} new generated plates to '{self.save_file_path}'")
+        self._unsaved.clear()
+        
+    
     def generate_numberplate(self, dvla_memory_tag: str, date_created_str: str) -> str:
         """generate a valid available number plate from the memory tag and date supplied
 
@@ -74,34 +358,129 @@ class UKNumberPlateGenerator:
             date_created_str (str): date car was manufactured in dd/mm/YYYY format
 
         Raises:
-            ValueError: if I, Q, Z is included in dvla_memory_tag
             ValueError: if dvla_memory_tag is not 2 chars long
+            ValueError: if date_created_str is not a valid dd/mm/YYYY date
+            ValueError: if I, Q, Z is included in dvla_memory_tag
+            ValueError: if dvla_memory_tag contains anything other than letters
             ValueError: if no available random strings left
 
         Returns:
             generated_number_plate (str): a valid uk number plate
         """
-        # created date string must be in dd/mm/YYYY format
-        date_created = datetime.strptime(date_created_str, "%d/%m/%Y")
+        number_plate_prefix = self._number_plate_prefix(dvla_memory_tag, date_created_str)
+        random_string = self.generate_available_random_string(number_plate_prefix)
+        generated_number_plate = f"{number_plate_prefix} {random_string}"
         
-        # I, Q, Z not allowed in UK number plates
-        dvla_memory_tag = dvla_memory_tag.upper()
-        if (any(invalid_char in dvla_memory_tag for invalid_char in ("I", "Q", "Z"))):
-            raise ValueError("I, Q, Z not allowed in UK number plates")
+        # save in memory but only in file if explicitly called
+        self.used_suffixes[number_plate_prefix].add(random_string)
+        self._unsaved.add(generated_number_plate)
         
-        # dvla memory tag must be of length 2
+        return generated_number_plate
+    
+    
+    def generate_numberplates(self, dvla_memory_tag: str, date_created_str: str, count: int) -> List[str]:
+        """generate several valid available number plates sharing the memory tag and date supplied
+
+        validates and parses the inputs once for the whole batch rather than once per plate
+
+        Args:
+            dvla_memory_tag (str): 2 character memory tag not including I, Q, Z
+            date_created_str (str): date car was manufactured in dd/mm/YYYY format
+            count (int): how many number plates to generate
+
+        Raises:
+            ValueError: if dvla_memory_tag is not 2 chars long
+            ValueError: if date_created_str is not a valid dd/mm/YYYY date
+            ValueError: if I, Q, Z is included in dvla_memory_tag
+            ValueError: if dvla_memory_tag contains anything other than letters
+            ValueError: if count is negative
+            ValueError: if there are not count available random strings left
+
+        Returns:
+            generated_number_plates (List[str]): count distinct valid uk number plates
+        """
+        if (count < 0):
+            raise ValueError("Number of plates to generate cannot be negative")
+        
+        number_plate_prefix = self._number_plate_prefix(dvla_memory_tag, date_created_str)
+        used_suffixes = self.used_suffixes[number_plate_prefix]
+        # kept in table order so a seeded random gives the same plates whatever the string hash seed
+        available_suffixes = [random_string for random_string in self.all_possible_random_strings if random_string not in used_suffixes]
+        if (count > len(available_suffixes)):
+            raise ValueError("No more unique strings available")
+        
+        random_strings = random.sample(available_suffixes, count)
+        qualified_prefix = number_plate_prefix + ' '
+        generated_number_plates = [qualified_prefix + random_string for random_string in random_strings]
+        
+        # save in memory but only in file if explicitly called
+        used_suffixes.update(random_strings)
+        self._unsaved.update(generated_number_plates)
+        
+        return generated_number_plates
+    
+    
+    def _number_plate_prefix(self, dvla_memory_tag: str, date_created_str: str) -> str:
+        """validate the memory tag and date and build the number plate prefix from them
+
+        Args:
+            dvla_memory_tag (str): 2 character memory tag not including I, Q, Z
+            date_created_str (str): date car was manufactured in dd/mm/YYYY format
+
+        Raises:
+            ValueError: if dvla_memory_tag is not 2 chars long
+            ValueError: if date_created_str is not a valid dd/mm/YYYY date
+            ValueError: if I, Q, Z is included in dvla_memory_tag
+            ValueError: if dvla_memory_tag contains anything other than letters
+
+        Returns:
+            number_plate_prefix (str): the memory tag followed by the age identifier
+        """
+        # dvla memory tag must be of length 2, checked on the uppercased tag as upper() can change the length (e.g. 'ß' -> 'SS')
+        dvla_memory_tag = dvla_memory_tag.upper()
         if (len(dvla_memory_tag) != 2):
             raise ValueError("DVLA memory tag must be 2 characters in length")
         
-        age_identifier = self.generate_age_identifier(date_created)
-        number_plate_prefix = f"{dvla_memory_tag}{age_identifier}"
-        random_string = self.generate_available_random_string(number_plate_prefix)
-        generated_number_plate = f"{number_plate_prefix} {random_string}"
+        # created date string must be in dd/mm/YYYY format
+        date_created = self._parse_date(date_created_str)
         
-        # save in memory but only in file if explicitly called
-        self.existing_generated_plates.add(generated_number_plate)
+        # I, Q, Z not allowed in UK number plates
+        if (not self._INVALID_CHARS.isdisjoint(dvla_memory_tag)):
+            raise ValueError("I, Q, Z not allowed in UK number plates")
         
-        return generated_number_plate
+        # only letters, anything else (e.g. '-' or ' ') cannot be stored or read back as a plate
+        if (not (dvla_memory_tag.isascii() and dvla_memory_tag.isalpha())):
+            raise ValueError("DVLA memory tag must only contain letters")
+        
+        age_identifier = self._age_code(date_created.year, date_created.month)
+        return f"{dvla_memory_tag}{age_identifier}"
+    
+    
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _parse_date(date_str: str) -> datetime:
+        """parse a dd/mm/YYYY date, cached as bulk generation tends to repeat the same dates
+
+        Args:
+            date_str (str): date in dd/mm/YYYY format
+
+        Raises:
+            ValueError: if date_str is not a valid dd/mm/YYYY date, raised by strptime
+
+        Returns:
+            datetime: the parsed date
+        """
+        # fast path for plain d/m/YYYY digits, which strptime would parse to the same date
+        parts = date_str.split('/')
+        if (len(parts) == 3 and all(part.isdigit() and part.isascii() for part in parts)
+                and len(parts[0]) <= 2 and len(parts[1]) <= 2 and len(parts[2]) == 4):
+            try:
+                return datetime(int(parts[2]), int(parts[1]), int(parts[0]))
+            except ValueError:
+                pass # e.g. 00/11/2017 or 31/02/2010, let strptime give its usual error
+        
+        # anything else is left to strptime, so unusual dates are accepted or rejected exactly as before
+        return datetime.strptime(date_str, "%d/%m/%Y")
     
     
     def generate_age_identifier(self, date_created: datetime) -> str:
@@ -113,16 +492,27 @@ class UKNumberPlateGenerator:
         Returns:
             age_identifier (str): 2 digit age identifier
         """
-        year = date_created.year
-        month = date_created.month
-        
+        return self._age_code(date_created.year, date_created.month)
+    
+    
+    @staticmethod
+    def _age_code(year: int, month: int) -> str:
+        """Generate 2 digit year code from the year and month the car was created
+
+        Args:
+            year (int): year the car was manufactured
+            month (int): month the car was manufactured
+
+        Returns:
+            age_identifier (str): 2 digit age identifier
+        """
         # cars manufactured from march to august use their year, otherwise, add 50
         if 3 <= month <= 8:
-            return str(year)[-2:]
+            return f"{year % 100:02d}"
         
         if month < 3:
             year -= 1 # account for overlap of vehicle year to normal year
-        return str(year + 50)[-2:]
+        return f"{(year + 50) % 100:02d}"
     
     
     def generate_available_random_string(self, number_plate_prefix: str) -> str:
@@ -137,17 +527,33 @@ class UKNumberPlateGenerator:
         Returns:
             random_string (str): a random string of length 3
         """
-        # Get a random starting index
-        start_index = random.randint(0, len(self.all_possible_random_strings) - 1)
-        
-        # Loop through the list starting from the random index, return the first available string
-        for i in range(len(self.all_possible_random_strings)):
-            index = (start_index + i) % len(self.all_possible_random_strings) # make sure to loop back around
-            random_string = self.all_possible_random_strings[index]
-            if(f"{number_plate_prefix} {random_string}" not in self.existing_generated_plates):
-                return random_string
-            
-        raise ValueError("No more unique strings available")
+        used_suffixes = self.used_suffixes[number_plate_prefix]
+        
+        # sparse prefix, a random guess is very likely to be free so try a few before doing any set work
+        if len(used_suffixes) < self._SPARSE_SUFFIX_LIMIT:
+            # hoist lookups out of the loop so each attempt is only local variable loads
+            getrandbits = random.getrandbits
+            index_bits = self._RANDOM_INDEX_BITS
+            all_possible_random_strings = self.all_possible_random_strings
+            string_count = len(all_possible_random_strings)
+            for _ in range(self._MAX_SAMPLE_ATTEMPTS):
+                # getrandbits is a single C call, reject the ~26% of indexes that fall past the end
+                index = getrandbits(index_bits)
+                while index >= string_count:
+                    index = getrandbits(index_bits)
+                random_string = all_possible_random_strings[index]
+                if(random_string not in used_suffixes):
+                    return random_string
+        
+        # dense prefix (or unlucky guesses), take the first free string after a random start index,
+        # filterfalse and islice run the scan in C and it stops as soon as a free string is found
+        all_possible_random_strings = self.all_possible_random_strings
+        start_index = random.randrange(len(all_possible_random_strings))
+        wrapped_strings = chain(islice(all_possible_random_strings, start_index, None), islice(all_possible_random_strings, start_index))
+        free_string = next(filterfalse(used_suffixes.__contains__, wrapped_strings), None)
+        if free_string is None:
+            raise ValueError("No more unique strings available")
+        return free_string
 
 
 if __name__ == "__main__":